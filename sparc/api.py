@@ -1,5 +1,4 @@
 import json
-from io import StringIO
 from pathlib import Path
 from warnings import warn
 
@@ -63,11 +62,12 @@ class SparcAPI:
             KeyError: If the parameter is not known to the SPARC version.
         """
         parameter = parameter.upper()
-        if parameter not in self.parameters.keys():
+        try:
+            return self.parameters[parameter]
+        except KeyError:
             raise KeyError(
                 f"Parameter {parameter} is not known to " f"SPARC {self.sparc_version}!"
-            )
-        return self.parameters[parameter]
+            ) from None
 
     def help_info(self, parameter):
         """Provides a detailed information string for a given parameter.
@@ -303,12 +303,12 @@ def _array_to_string(arr, format):
     arr = np.array(arr)
     if arr.ndim == 1:
         arr = arr.reshape(1, -1)
-    buf = StringIO()
     if format in ("integer array", "integer"):
         fmt = "%d"
     elif format in ("double array", "double"):
         fmt = "%.14f"
-    np.savetxt(buf, arr, delimiter=" ", fmt=fmt, header="", footer="", newline="\n")
-    # Return the string output of the buffer with
-    # whitespaces removed
-    return buf.getvalue().strip()
+    # Format the whole array with a single string operation,
+    # same output as np.savetxt(delimiter=" ") but without the per-row loop
+    nrows, ncols = arr.shape
+    array_fmt = "\n".join([" ".join([fmt] * ncols)] * nrows)
+    return (array_fmt % tuple(arr.ravel().tolist())).strip()
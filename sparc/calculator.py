@@ -1,15 +1,26 @@
 import datetime
+import inspect
+import multiprocessing as mp
 import os
+import shlex
 import signal
 import subprocess
 import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from copy import deepcopy
+from functools import lru_cache
 from pathlib import Path
 from warnings import warn, warn_explicit
 
 import numpy as np
 import psutil
 from ase.atoms import Atoms
-from ase.calculators.calculator import Calculator, FileIOCalculator, all_changes
+from ase.calculators.calculator import (
+    Calculator,
+    FileIOCalculator,
+    Parameters,
+    all_changes,
+)
 
 # 2024-11-28: @alchem0x2a add support for ase.config
 # In the first we only use cfg as parser for configurations
@@ -28,10 +39,12 @@ from .socketio import (
     generate_random_socket_name,
 )
 from .utils import (
+    _atoms_fingerprint,
     _find_default_sparc,
     _find_mpi_process,
     _get_slurm_jobid,
     _locate_slurm_step,
+    _set_mpi_num_procs,
     _slurm_signal,
     compare_dict,
     deprecated,
@@ -44,14 +57,36 @@ from .utils import (
 # Below are a list of ASE-compatible calculator input parameters that are
 # in Angstrom/eV units
 # Ideas are taken from GPAW calculator
-sparc_python_inputs = [
-    "xc",
-    "h",
-    "kpts",
-    "convergence",
-    "gpts",
-    "nbands",
-]
+sparc_python_inputs = frozenset(
+    [
+        "xc",
+        "h",
+        "kpts",
+        "convergence",
+        "gpts",
+        "nbands",
+    ]
+)
+
+# Mapping of the (lower-case) ASE-style xc names to SPARC EXCHANGE_CORRELATION
+xc_mapping = {
+    "pbe": "GGA_PBE",
+    "lda": "LDA_PZ",
+    "rpbe": "GGA_RPBE",
+    "pbesol": "GGA_PBEsol",
+    "pbe0": "PBE0",
+    "hf": "HF",
+    # backward compatibility for HSE03. Note HSE06 is not supported yet
+    "hse": "HSE",
+    "hse03": "HSE",
+    # backward compatibility for VASP-style XCs
+    "vdwdf1": "vdWDF1",
+    "vdw-df": "vdWDF1",
+    "vdw-df1": "vdWDF1",
+    "vdwdf2": "vdWDF2",
+    "vdw-df2": "vdWDF2",
+    "scan": "SCAN",
+}
 
 # The socket mode in SPARC calculator uses a relay-based mechanism
 # Several scenarios:
@@ -68,6 +103,24 @@ default_socket_params = {
     "server_only": False,  # Start the calculator as a server
 }
 
+# Parameters in the .inpt file that are generated from the atoms object
+atoms_inpt_params = frozenset(["LATVEC", "LATVEC_SCALE", "CELL", "BC", "TWIST_ANGLE"])
+
+# SparcBundle attributes set by read_raw_results, kept by SPARC.from_directory
+cached_bundle_attrs = (
+    "raw_results",
+    "sorting",
+    "last_image",
+    "num_calculations",
+    "init_atoms",
+    "init_inputs",
+    "psp_data",
+)
+
+# Versions of the sparc binaries detected in this session, keyed by the command.
+# Avoids re-running the test calculation for every calculator with check_version=True
+_sparc_version_cache = {}
+
 
 class SPARC(FileIOCalculator, IOContext):
     """Calculator interface to the SPARC codes via the FileIOCalculator"""
@@ -132,6 +185,7 @@ class SPARC(FileIOCalculator, IOContext):
         self.valid_params = {}
         self.special_params = {}
         self.inpt_state = {}  # Store the inpt file states
+        self._unchanged_fingerprints = {}  # Atoms pairs known to be unchanged
         self.system_state = {}  # Store the system parameters (directory, bundle etc)
         FileIOCalculator.__init__(
             self,
@@ -149,7 +203,7 @@ class SPARC(FileIOCalculator, IOContext):
 
         # Use psp dir from user input or env
         self.sparc_bundle = SparcBundle(
-            directory=Path(self.directory),
+            directory=self.directory,
             mode="w",
             atoms=self.atoms,
             label=label,  # The order is tricky here. Use label not self.label
@@ -178,6 +232,7 @@ class SPARC(FileIOCalculator, IOContext):
 
         # TODO: check parameter compatibility with socket params
         self.process = None
+        self._executor = None  # Background thread for execute_async
         # self.pid = None
 
         # Initialize the socket settings
@@ -361,10 +416,11 @@ class SPARC(FileIOCalculator, IOContext):
 
     @property
     def directory(self):
+        # The setter always stores a Path, no need to re-wrap on every access
         if hasattr(self, "sparc_bundle"):
-            return Path(self.sparc_bundle.directory)
+            return self.sparc_bundle.directory
         else:
-            return Path(self._directory)
+            return self._directory
 
     @directory.setter
     def directory(self, directory):
@@ -420,8 +476,19 @@ class SPARC(FileIOCalculator, IOContext):
 
         reading a result from the .out file has only precision up to 10 digits
 
-
+        If the same pair of atoms (by fingerprint) has already been compared
+        without changes, the full comparison is skipped
         """
+        if self.atoms is not None:
+            fingerprints = (_atoms_fingerprint(self.atoms), _atoms_fingerprint(atoms))
+            if (
+                fingerprints == self._unchanged_fingerprints.get(tol, None)
+                and self._compare_system_state()
+            ):
+                return []
+        else:
+            fingerprints = None
+
         atoms_copy = atoms.copy()
         if "initial_magmoms" not in atoms_copy.arrays:
             atoms_copy.set_initial_magnetic_moments(
@@ -441,6 +508,8 @@ class SPARC(FileIOCalculator, IOContext):
         system_state_changed = not self._compare_system_state()
         if system_state_changed:
             system_changes.append("system_state")
+        if (fingerprints is not None) and (len(system_changes) == 0):
+            self._unchanged_fingerprints = {tol: fingerprints}
         return system_changes
 
     def _make_command(self, extras=""):
@@ -456,14 +525,16 @@ class SPARC(FileIOCalculator, IOContext):
 
         2024.11.28 @alchem0x2a
         Make use of the ase.config to set up the command
+
+        Note the command is split with shlex and executed without a shell
+        (both in the normal and socket modes), so shell features like $VAR, ~, ;, && and redirections are not
+        supported in the command string
         """
         if isinstance(extras, (list, tuple)):
             extras = " ".join(extras)
         else:
             extras = extras.strip()
 
-        print(self.command)
-
         # User-provided command (and properly initialized) should have
         # highest priority
         if (self.command is not None) and (
@@ -557,8 +628,28 @@ class SPARC(FileIOCalculator, IOContext):
                 )
         return
 
-    def calculate(self, atoms=None, properties=["energy"], system_changes=all_changes):
-        """Perform a calculation step"""
+    def calculate(
+        self,
+        atoms=None,
+        properties=["energy"],
+        system_changes=all_changes,
+        wait=True,
+    ):
+        """Perform a calculation step
+
+        Arguments:
+            wait (bool): If False, return right after the input files are written.
+                         SPARC runs and the results are parsed in a background thread,
+                         the calculator should not be used before the returned
+                         future is done. Not supported in the socket mode
+
+        Returns:
+            concurrent.futures.Future or None: future of the calculation if wait=False
+        """
+        if (not wait) and self.use_socket:
+            raise NotImplementedError(
+                "SPARC.calculate(wait=False) does not support the socket mode!"
+            )
 
         self.check_input_atoms(atoms)
         Calculator.calculate(self, atoms, properties, system_changes)
@@ -581,6 +672,14 @@ class SPARC(FileIOCalculator, IOContext):
             )
             return
         self.write_input(self.atoms, properties, system_changes)
+        if not wait:
+            return self._get_executor().submit(self._execute_and_read, atoms)
+        self._execute_and_read(atoms)
+
+    def _execute_and_read(self, atoms):
+        """Run SPARC and parse the results. The final structure of a
+        geopt or aimd calculation is copied back to atoms
+        """
         self.execute()
         self.read_results()
         # Extra step, copy the atoms back to original atoms, if it's an
@@ -598,6 +697,63 @@ class SPARC(FileIOCalculator, IOContext):
                     self.atoms.get_initial_magnetic_moments()
                 )
 
+    def calculate_many(
+        self, atoms_list, properties=["energy"], n_workers=1, total_cores=None
+    ):
+        """Run independent SPARC calculations on several images concurrently
+
+        Each image is calculated with a copy of the current calculator in
+        the subdirectory img_{i} of self.directory. Useful for NEB images,
+        conformers or phonon displacements
+
+        Note the worker processes are started with the "spawn" method, which
+        re-imports the __main__ module. Scripts calling calculate_many must
+        therefore protect their entry point with `if __name__ == "__main__":`
+
+        Arguments:
+            atoms_list (List[Atoms]): Images to be calculated
+            properties (List[str]): Properties to calculate for each image
+            n_workers (int): Number of SPARC runs at the same time
+            total_cores (int or None): If provided, the mpi processes in the command
+                                       are set to total_cores // n_workers for each run
+
+        Returns:
+            List[dict]: The calculator results for each image
+        """
+        if self.use_socket:
+            raise NotImplementedError(
+                "SPARC.calculate_many does not support the socket mode!"
+            )
+        command = self._make_command().strip()
+        if total_cores is not None:
+            cores_per_job = max(total_cores // n_workers, 1)
+            command = _set_mpi_num_procs(command, cores_per_job)
+
+        calc_kwargs = dict(
+            label=self.label,
+            command=command,
+            psp_dir=self.sparc_bundle.psp_dir,
+            log=self._log,
+            keep_old_files=self.keep_old_files,
+            **self.special_params,
+            **self.valid_params,
+        )
+        # Workers use the same parameter definitions as the parent
+        if self.validator.source["type"] == "json":
+            calc_kwargs["sparc_json_file"] = self.validator.source["path"]
+        else:
+            calc_kwargs["sparc_doc_path"] = self.validator.source["path"]
+        jobs = [
+            (self.directory / f"img_{i}", atoms, properties, calc_kwargs)
+            for i, atoms in enumerate(atoms_list)
+        ]
+        # Use spawn to avoid forking a process that holds MPI resources
+        with ProcessPoolExecutor(
+            max_workers=n_workers, mp_context=mp.get_context("spawn")
+        ) as pool:
+            results = list(pool.map(_calculate_image, jobs))
+        return results
+
     def _calculate_as_server(
         self, atoms=None, properties=["energy"], system_changes=all_changes
     ):
@@ -660,9 +816,9 @@ class SPARC(FileIOCalculator, IOContext):
             # Use the IOContext class's lazy context manager
             # TODO what if self.log is None
             fd_log = self.openfile(file=self.log, comm=world)
+            # No intermediate shell, same as the non-socket execute
             self.process = subprocess.Popen(
-                cmds,
-                shell=True,
+                shlex.split(cmds),
                 stdout=fd_log,
                 stderr=fd_log,
                 cwd=self.directory,
@@ -815,16 +971,17 @@ class SPARC(FileIOCalculator, IOContext):
         command = self._make_command(extras=extras)
         self.print_sysinfo(command)
 
+        # Run the command without an intermediate shell. subprocess.run kills
+        # the child if the wait is interrupted (e.g. KeyboardInterrupt)
+        argv = shlex.split(command)
         try:
             if self.log is not None:
                 with open(self.log, "a") as fd:
                     self.process = subprocess.run(
-                        command, shell=True, cwd=self.directory, stdout=fd
+                        argv, cwd=self.directory, stdout=fd, stderr=subprocess.STDOUT
                     )
             else:
-                self.process = subprocess.run(
-                    command, shell=True, cwd=self.directory, stdout=None
-                )
+                self.process = subprocess.run(argv, cwd=self.directory, stdout=None)
         except OSError as err:
             msg = 'Failed to execute "{}"'.format(command)
             raise EnvironmentError(msg) from err
@@ -838,8 +995,28 @@ class SPARC(FileIOCalculator, IOContext):
 
         return
 
+    def _get_executor(self):
+        """Single-thread executor for background SPARC runs, created on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        return self._executor
+
+    def execute_async(self):
+        """Start self.execute() in a background thread and return immediately,
+        so that the driver can e.g. prepare the next inputs while SPARC runs.
+        Calls are queued, only one SPARC process runs at a time
+
+        Returns:
+            concurrent.futures.Future: resolves when the SPARC process exits,
+                                       re-raises any error from execute()
+        """
+        return self._get_executor().submit(self.execute)
+
     def close(self, keep_out_socket=False):
         """Close the socket communication, the SPARC process etc"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
         if not self.use_socket:
             return
         if self.in_socket is not None:
@@ -930,26 +1107,45 @@ class SPARC(FileIOCalculator, IOContext):
     def read_results(self):
         """Parse from the SparcBundle"""
         # self.sparc_bundle.read_raw_results()
-        last = self.sparc_bundle.convert_to_ase(indices=-1, include_all_files=False)
+        last = self.sparc_bundle.convert_to_ase(index=-1, include_all_files=False)
         self.atoms = last.copy()
         self.results.update(last.calc.results)
 
-    def _restart(self, restart=None):
+    def _restart(self, restart=None, reload_parameters=None, cached_results=None):
         """Reload the input parameters and atoms from previous calculation.
 
         If self.parameters is already set, the parameters will not be loaded
         If self.atoms is already set, the atoms will be not be read
+        In both cases the previous results are cleared
+
+        Arguments:
+            restart (str or Path or None): If None, do nothing
+            reload_parameters (bool or None): Whether to load the parameters from
+                                              the inpt file. If None, only when
+                                              self.parameters is empty
+            cached_results (tuple or None): (atoms, bundle_state) already parsed by
+                                            SPARC.from_directory, used instead of
+                                            reading the bundle again
         """
         if restart is None:
             return
         reload_atoms = self.atoms is None
-        reload_parameters = len(self.parameters) == 0
+        if reload_parameters is None:
+            reload_parameters = len(self.parameters) == 0
 
-        self.read_results()
+        if cached_results is None:
+            self.read_results()
+        else:
+            # Copies protect the cached objects from modification
+            atoms, bundle_state = deepcopy(cached_results)
+            for key, value in bundle_state.items():
+                setattr(self.sparc_bundle, key, value)
+            self.atoms = atoms.copy()
+            self.results.update(atoms.calc.results)
         if not reload_atoms:
             self.atoms = None
         if reload_parameters:
-            self.parameters = self.raw_results["inpt"]["params"]
+            self._load_inpt_parameters(self.raw_results["inpt"]["params"])
 
         if (not reload_parameters) or (not reload_atoms):
             warn(
@@ -960,16 +1156,114 @@ class SPARC(FileIOCalculator, IOContext):
             self.sparc_bundle.raw_results.clear()
         return
 
+    def _load_inpt_parameters(self, inpt_params):
+        """Validate and set the parameters read from an inpt file, so that
+        self.parameters matches what the next write_input produces.
+        Parameters generated from the atoms (e.g. LATVEC) are skipped, and the
+        default ASE-style parameters superseded by the SPARC ones are removed.
+        Unlike self.set, the current results are not reset
+        """
+        params = {
+            key: value
+            for key, value in inpt_params.items()
+            if key.upper() not in atoms_inpt_params
+        }
+        # e.g. inpt files written by older SPARC versions
+        unknown_params = [
+            key for key in params if key.upper() not in self.validator.parameters
+        ]
+        if unknown_params:
+            warn(
+                f"Parameters {unknown_params} in the inpt file are not known to "
+                f"SPARC {self.validator.sparc_version} and will not be loaded."
+            )
+            for key in unknown_params:
+                params.pop(key)
+        self._sanitize_kwargs(**params)
+        if "EXCHANGE_CORRELATION" in self.valid_params:
+            self.special_params.pop("xc", None)
+        if "KPOINT_GRID" in self.valid_params:
+            self.special_params.pop("kpts", None)
+        if any(key in self.valid_params for key in ("FD_GRID", "ECUT", "MESH_SPACING")):
+            self.special_params.pop("h", None)
+        self.parameters = Parameters(**self.special_params, **self.valid_params)
+        return
+
     def get_fermi_level(self):
         """Extra get-method for Fermi level, if calculated"""
         return self.results.get("fermi", None)
 
+    @classmethod
+    def from_directory(cls, directory, label=None, **kwargs):
+        """Create a calculator with the results of a finished calculation
+
+        Parsed results are cached in-process and keyed on the directory
+        and the latest file modification time, so repeatedly loading the
+        same unchanged directories does not parse the files again
+
+        Like restarting the calculator, if calculator parameters or atoms are
+        provided in kwargs, the previous results are cleared
+
+        Arguments:
+            directory (str or Path): Directory of the SPARC calculation
+            label (str or None): Label of the calculation files. If None, infer from the .ion file
+            **kwargs: Additional arguments for the calculator, e.g. command or psp_dir
+
+        Returns:
+            SPARC: calculator with atoms, results and parameters loaded
+        """
+        directory = Path(directory).resolve()
+        with os.scandir(directory) as entries:
+            mtime_ns = max(
+                (e.stat().st_mtime_ns for e in entries if e.is_file()), default=0
+            )
+        label, atoms, bundle_state = _read_results_cached(
+            str(directory), label, mtime_ns
+        )
+        calc = cls(directory=directory, label=label, **kwargs)
+        # Keyword arguments that are not in __init__ are calculator parameters
+        init_args = inspect.signature(cls.__init__).parameters
+        user_parameters = [key for key in kwargs if key not in init_args]
+        calc._restart(
+            restart=directory,
+            reload_parameters=len(user_parameters) == 0,
+            cached_results=(atoms, bundle_state),
+        )
+        return calc
+
     def detect_sparc_version(self):
-        """Run a short sparc test to determine which sparc is used"""
+        """Run a short sparc test to determine which sparc is used
+
+        The detected version is cached for each command, so the test
+        calculation only runs once per sparc binary
+        """
         try:
             cmd = self._make_command()
         except EnvironmentError:
             return None
+        version = _sparc_version_cache.get(self.command, None)
+        if version is None:
+            version = self._run_version_test()
+            if version is not None:
+                _sparc_version_cache[self.command] = version
+        # Warning information about version mismatch between binary and JSON API
+        # only when both are not None
+        if (version is None) and (self.validator.sparc_version is not None):
+            if version != self.validator.sparc_version:
+                warn(
+                    (
+                        f"SPARC binary version {version} does not match JSON API version {self.validator.sparc_version}. "
+                        "You can set $SPARC_DOC_PATH to the SPARC documentation location."
+                    )
+                )
+        return version
+
+    def _run_version_test(self):
+        """Run the short calculation behind detect_sparc_version
+
+        Returns:
+            str or None: SPARC version parsed from the .out file
+        """
         print("Running a short calculation to determine SPARC version....")
         # check_version must be set to False to avoid recursive calling
         new_calc = SPARC(
@@ -984,16 +1278,6 @@ class SPARC(FileIOCalculator, IOContext):
             except Exception as e:
                 print("Error handling simple calculation: ", e)
                 version = None
-        # Warning information about version mismatch between binary and JSON API
-        # only when both are not None
-        if (version is None) and (self.validator.sparc_version is not None):
-            if version != self.validator.sparc_version:
-                warn(
-                    (
-                        f"SPARC binary version {version} does not match JSON API version {self.validator.sparc_version}. "
-                        "You can set $SPARC_DOC_PATH to the SPARC documentation location."
-                    )
-                )
         return version
 
     def run_client(self, atoms=None, use_stress=False):
@@ -1012,8 +1296,11 @@ class SPARC(FileIOCalculator, IOContext):
         except EnvironmentError:
             return False
         with tempfile.TemporaryDirectory() as tmpdir:
-            proc = subprocess.run(cmd, shell=True, cwd=tmpdir, capture_output=True)
-            output = proc.stdout.decode("ascii")
+            try:
+                proc = subprocess.run(shlex.split(cmd), cwd=tmpdir, capture_output=True)
+                output = proc.stdout.decode("ascii")
+            except OSError:
+                output = ""
             if "USAGE:" not in output:
                 raise EnvironmentError(
                     "Cannot find the sparc executable! Please make sure you have the correct setup"
@@ -1080,6 +1367,7 @@ class SPARC(FileIOCalculator, IOContext):
                 warn("Parameter h will overwrite previously set parameter gpts.")
 
         upper_valid_params = set()  # Valid SPARC parameters in upper case
+        duplicate_params = {}  # Ordered set, reported together in one warning
         # SPARC API is case insensitive
         for key, value in kwargs.items():
             if key in self.special_inputs:
@@ -1089,7 +1377,7 @@ class SPARC(FileIOCalculator, IOContext):
             else:
                 key = key.upper()
                 if key in upper_valid_params:
-                    warn(f"Parameter {key} (case-insentive) appears multiple times!")
+                    duplicate_params[key] = None
                 if validator.validate_input(key, value):
                     self.valid_params[key] = value
                     upper_valid_params.add(key)
@@ -1097,6 +1385,11 @@ class SPARC(FileIOCalculator, IOContext):
                     raise ValueError(
                         f"Value {value} for parameter {key} (case-insensitive) is invalid!"
                     )
+        if duplicate_params:
+            warn(
+                f"Parameters {list(duplicate_params)} (case-insensitive) appear "
+                "multiple times! The last values are used."
+            )
         return
 
     def _convert_special_params(self, atoms=None):
@@ -1113,34 +1406,10 @@ class SPARC(FileIOCalculator, IOContext):
         # xc --> EXCHANGE_CORRELATION
         if "xc" in params:
             xc = params.pop("xc")
-            if xc.lower() == "pbe":
-                converted_sparc_params["EXCHANGE_CORRELATION"] = "GGA_PBE"
-            elif xc.lower() == "lda":
-                converted_sparc_params["EXCHANGE_CORRELATION"] = "LDA_PZ"
-            elif xc.lower() == "rpbe":
-                converted_sparc_params["EXCHANGE_CORRELATION"] = "GGA_RPBE"
-            elif xc.lower() == "pbesol":
-                converted_sparc_params["EXCHANGE_CORRELATION"] = "GGA_PBEsol"
-            elif xc.lower() == "pbe0":
-                converted_sparc_params["EXCHANGE_CORRELATION"] = "PBE0"
-            elif xc.lower() == "hf":
-                converted_sparc_params["EXCHANGE_CORRELATION"] = "HF"
-            # backward compatibility for HSE03. Note HSE06 is not supported yet
-            elif (xc.lower() == "hse") or (xc.lower() == "hse03"):
-                converted_sparc_params["EXCHANGE_CORRELATION"] = "HSE"
-            # backward compatibility for VASP-style XCs
-            elif (
-                (xc.lower() == "vdwdf1")
-                or (xc.lower() == "vdw-df")
-                or (xc.lower() == "vdw-df1")
-            ):
-                converted_sparc_params["EXCHANGE_CORRELATION"] = "vdWDF1"
-            elif (xc.lower() == "vdwdf2") or (xc.lower() == "vdw-df2"):
-                converted_sparc_params["EXCHANGE_CORRELATION"] = "vdWDF2"
-            elif xc.lower() == "scan":
-                converted_sparc_params["EXCHANGE_CORRELATION"] = "SCAN"
-            else:
-                raise ValueError(f"xc keyword value {xc} is invalid!")
+            try:
+                converted_sparc_params["EXCHANGE_CORRELATION"] = xc_mapping[xc.lower()]
+            except KeyError:
+                raise ValueError(f"xc keyword value {xc} is invalid!") from None
 
         # h --> gpts
         if "h" in params:
@@ -1324,9 +1593,6 @@ class SPARC(FileIOCalculator, IOContext):
     def get_runtime(self):
         raise NotImplemented
 
-    def get_fermi_level(self):
-        raise NotImplemented
-
     @deprecated
     def concatinate_output(self):
         raise DeprecationWarning("Functionality moved in sparc.SparcBundle.")
@@ -1366,3 +1632,27 @@ class SPARC(FileIOCalculator, IOContext):
     @deprecated
     def dict_atoms(self, *args, **kwargs):
         raise DeprecationWarning("")
+
+
+@lru_cache(maxsize=4096)
+def _read_results_cached(directory, label, mtime_ns):
+    """Read the last image of a SPARC bundle, used by SPARC.from_directory.
+    mtime_ns is only part of the cache key
+
+    Returns:
+        label, Atoms with SinglePointDFTCalculator, dict of the bundle attributes
+    """
+    sb = SparcBundle(directory=directory, mode="r", label=label)
+    atoms = sb.convert_to_ase(index=-1, include_all_files=False)
+    bundle_state = {key: getattr(sb, key) for key in cached_bundle_attrs}
+    return sb.label, atoms, bundle_state
+
+
+def _calculate_image(job):
+    """Worker of SPARC.calculate_many. Defined at module level
+    so that it can be pickled by the process pool
+    """
+    directory, atoms, properties, calc_kwargs = job
+    calc = SPARC(directory=directory, **calc_kwargs)
+    calc.calculate(atoms.copy(), properties=properties)
+    return calc.results
@@ -1,6 +1,6 @@
 from pathlib import Path
 
-import pkg_resources
-
-repo_dir = Path(pkg_resources.resource_filename("sparc", "."))
-psp_dir = Path(pkg_resources.resource_filename("sparc", "psp"))
+# Resolve the package data from the module location instead of
+# pkg_resources, which is slow to import
+repo_dir = Path(__file__).parent
+psp_dir = repo_dir / "psp"
@@ -1,7 +1,10 @@
 """Providing a new bundled SPARC file format
 """
+import multiprocessing as mp
 import os
+import pickle
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from warnings import warn
 
@@ -27,6 +30,13 @@ from .utils import deprecated, locate_api, sanitize_path, string2index
 # from .sparc_parsers.ion import read_ion, write_ion
 defaultAPI = locate_api(cfg=_cfg)
 
+# Sidecar file storing parsed raw results of a bundle, see SparcBundle.read_raw_results
+results_cache_file = ".sparc_cache.pkl"
+# Bump when the layout of raw_results changes to invalidate old cache files
+results_cache_version = 1
+# Array results that can be stored in reduced precision, see SparcBundle.convert_to_ase
+reduced_precision_results = ("forces", "stress", "stress_equiv")
+
 
 class SparcBundle:
     """Provide access to a calculation folder of SPARC as a simple bundle
@@ -61,12 +71,15 @@ class SparcBundle:
 
     Methods:
         __find_psp_dir(psp_dir=None): Finds the directory for SPARC pseudopotentials.
+        _scan_files(): Lists the files in the bundle grouped by suffix.
         _find_files(): Finds all files matching the bundle label.
         _make_label(label=None): Infers or sets the label for the SPARC bundle.
         _indir(ext, label=None, occur=0, d_format="{:02d}"): Finds a file with a specific extension in the bundle.
         _read_ion_and_inpt(): Reads .ion and .inpt files together.
         _write_ion_and_inpt(): Writes .ion and .inpt files to the bundle.
         _read_results_from_index(index, d_format="{:02d}"): Reads results from a specific calculation index.
+        _files_from_index(index, d_format="{:02d}"): Finds the input and output files of a calculation index.
+        _check_index_results(results_dict): Checks the results of a calculation index and updates the sorting.
         _make_singlepoint(calc_results, images, raw_results): Converts results and images to SinglePointDFTCalculators.
         _extract_static_results(raw_results, index=":"): Extracts results from static calculations.
         _extract_geopt_results(raw_results, index=":"): Extracts results from geometric optimization calculations.
@@ -123,9 +136,33 @@ class SparcBundle:
         self.last_image = -1
         self.validator = validator
 
+    def _scan_files(self):
+        """List the files in the bundle directory in a single os.scandir pass,
+        grouped by their suffix, e.g. {".ion": [...], ".out_01": [...]}
+
+        Returns:
+            dict: suffix --> list of os.DirEntry
+        """
+        by_suffix = {}
+        if not self.directory.is_dir():
+            return by_suffix
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                suffix = os.path.splitext(entry.name)[1]
+                by_suffix.setdefault(suffix, []).append(entry)
+        return by_suffix
+
     def _find_files(self):
         """Find all files matching '{label}.*'"""
-        return list(self.directory.glob(f"{self.label}.*"))
+        prefix = f"{self.label}."
+        return [
+            Path(entry.path)
+            for entries in self._scan_files().values()
+            for entry in entries
+            if entry.name.startswith(prefix)
+        ]
 
     def _make_label(self, label=None):
         """Infer the label from the bundle
@@ -146,7 +183,7 @@ class SparcBundle:
             label_ = prefix
         else:
             # read
-            match_ion = list(self.directory.glob("*.ion"))
+            match_ion = self._scan_files().get(".ion", [])
             if len(match_ion) > 1:
                 raise ValueError(
                     "Cannot read sparc bundle with multiple ion files without specifying the label!"
@@ -326,7 +363,7 @@ class SparcBundle:
         self.sorting = ion_dict.get("sorting", None)
         return
 
-    def read_raw_results(self, include_all_files=False):
+    def read_raw_results(self, include_all_files=False, use_cache=False, n_workers=1):
         """Parse all files using the given self.label.
         The results are merged dict from all file formats
 
@@ -334,6 +371,16 @@ class SparcBundle:
             include_all_files (bool): Whether to include output files with different suffices
                                       If true: include all files (e.g. SPARC.out, SPARC.out_01,
                                       SPARC.out_02, etc).
+            use_cache (bool): If true, reuse the results stored in .sparc_cache.pkl
+                              when none of the {label}.* files have changed, and
+                              update the cache file after parsing.
+                              Warning: the cache is a pickle file, and loading a
+                              pickle can execute arbitrary code. Only use the cache
+                              for bundles you created or trust, never for
+                              downloaded datasets
+            n_workers (int): Number of processes to parse the output files of different
+                             calculations (e.g. SPARC.aimd, SPARC.aimd_01) in parallel.
+                             Only used when include_all_files is True
         Returns:
             dict or List: Dict containing all raw results. Only some of them will appear in the calculator's results
 
@@ -344,29 +391,67 @@ class SparcBundle:
         #TODO: @TT last_image is a bad name, it should refer to the occurance of images
                the same goes with num_calculations
         """
+        if use_cache:
+            signature = self._results_signature(include_all_files)
+            cached = self._load_cached_results(signature)
+        else:
+            cached = None
+
+        if cached is not None:
+            self.last_image = cached["last_image"]
+            self.num_calculations = self.last_image + 1
+            if self.sorting is None:
+                self.sorting = cached["sorting"]
+            self.raw_results = cached["raw_results"]
+        else:
+            self._parse_raw_results(
+                include_all_files=include_all_files, n_workers=n_workers
+            )
+            if use_cache:
+                self._dump_cached_results(signature)
+
+        if include_all_files:
+            init_raw_results = self.raw_results[0]
+        else:
+            init_raw_results = self.raw_results.copy()
+
+        self.init_atoms = dict_to_atoms(init_raw_results)
+        self.init_inputs = {
+            "ion": init_raw_results["ion"],
+            "inpt": init_raw_results["inpt"],
+        }
+        self.psp_data = self.read_psp_info()
+        return self.raw_results
+
+    def _parse_raw_results(self, include_all_files=False, n_workers=1):
+        """Parse the output files and set self.raw_results,
+        self.last_image and self.num_calculations
+        """
         # Find the max output index
-        out_files = self.directory.glob(f"{self.label}.out*")
-        valid_out_files = [
-            f
-            for f in out_files
-            if (re.fullmatch(r"^\.out(?:_\d+)?$", f.suffix) is not None)
+        out_indices = [
+            0 if suffix == ".out" else int(suffix.split("_")[1])
+            for suffix, entries in self._scan_files().items()
+            if (re.fullmatch(r"^\.out(?:_\d+)?$", suffix) is not None)
+            and any(entry.name == f"{self.label}{suffix}" for entry in entries)
         ]
-        # Combine and sort the file lists
-        last_out = sorted(valid_out_files, reverse=True)
         # No output file, only ion / inpt
-        if len(last_out) == 0:
-            self.last_image = -1
-        else:
-            suffix = last_out[0].suffix
-            if suffix == ".out":
-                self.last_image = 0
-            else:
-                self.last_image = int(suffix.split("_")[1])
+        self.last_image = max(out_indices, default=-1)
         self.num_calculations = self.last_image + 1
 
         # Always make sure ion / inpt results are parsed regardless of actual calculations
         if include_all_files:
-            if self.num_calculations > 0:
+            if (self.num_calculations > 1) and (n_workers > 1):
+                files = [
+                    self._files_from_index(index)
+                    for index in range(self.num_calculations)
+                ]
+                # Use spawn to avoid forking a process that holds MPI resources
+                with ProcessPoolExecutor(
+                    max_workers=n_workers, mp_context=mp.get_context("spawn")
+                ) as pool:
+                    parsed = list(pool.map(_parse_bundle_files, files))
+                results = [self._check_index_results(res) for res in parsed]
+            elif self.num_calculations > 0:
                 results = [
                     self._read_results_from_index(index)
                     for index in range(self.num_calculations)
@@ -377,19 +462,57 @@ class SparcBundle:
             results = self._read_results_from_index(self.last_image)
 
         self.raw_results = results
+        return
 
-        if include_all_files:
-            init_raw_results = self.raw_results[0]
-        else:
-            init_raw_results = self.raw_results.copy()
+    def _results_signature(self, include_all_files=False):
+        """Key of the results cache: the (mtime, size) of all {label}.* files
+        together with the reading options
+        """
+        files = {}
+        for f in self._find_files():
+            stat = f.stat()
+            files[f.name] = (stat.st_mtime_ns, stat.st_size)
+        return {
+            "version": results_cache_version,
+            "label": self.label,
+            "include_all_files": include_all_files,
+            "files": files,
+        }
 
-        self.init_atoms = dict_to_atoms(init_raw_results)
-        self.init_inputs = {
-            "ion": init_raw_results["ion"],
-            "inpt": init_raw_results["inpt"],
+    def _load_cached_results(self, signature):
+        """Load the cached results if the signature matches, otherwise return None"""
+        cache_file = self.directory / results_cache_file
+        if not cache_file.is_file():
+            return None
+        try:
+            with open(cache_file, "rb") as fd:
+                cached = pickle.load(fd)
+        except Exception:
+            warn(
+                f"Cannot load results cache {cache_file}, the bundle will be re-parsed."
+            )
+            return None
+        if not isinstance(cached, dict) or cached.get("signature", None) != signature:
+            return None
+        return cached
+
+    def _dump_cached_results(self, signature):
+        """Write the current raw results to the cache file.
+        A failed write (e.g. read-only directory) only gives a warning
+        """
+        cache_file = self.directory / results_cache_file
+        cached = {
+            "signature": signature,
+            "raw_results": self.raw_results,
+            "last_image": self.last_image,
+            "sorting": self.sorting,
         }
-        self.psp_data = self.read_psp_info()
-        return self.raw_results
+        try:
+            with open(cache_file, "wb") as fd:
+                pickle.dump(cached, fd)
+        except OSError as e:
+            warn(f"Cannot write results cache {cache_file}: {e}")
+        return
 
     def _read_results_from_index(self, index, d_format="{:02d}"):
         """Read the results from one calculation index, and return a
@@ -406,19 +529,41 @@ class SparcBundle:
         #TODO: @TT should we call index --> occurance?
 
         """
-        results_dict = {}
+        results_dict = _parse_bundle_files(self._files_from_index(index, d_format))
+        return self._check_index_results(results_dict)
+
+    def _files_from_index(self, index, d_format="{:02d}"):
+        """Existing input and output files of one calculation index,
+        e.g. {"ion": SPARC.ion, "inpt": SPARC.inpt, "static": SPARC.static_01}
+
+        Arguments:
+            index (int): Index of image to return the results
+            d_format (str): Format for the index suffix
 
+        Returns:
+            dict: file extension --> path, in the order of parsing
+        """
+        files = {}
         for ext in ("ion", "inpt"):
             f = self._indir(ext, occur=0)
             if f.is_file():
-                data_dict = globals()[f"_read_{ext}"](f)
-                results_dict.update(data_dict)
+                files[ext] = f
         for ext in ("geopt", "static", "aimd", "out"):
             f = self._indir(ext, occur=index, d_format=d_format)
             if f.is_file():
-                data_dict = globals()[f"_read_{ext}"](f)
-                results_dict.update(data_dict)
+                files[ext] = f
+        return files
+
+    def _check_index_results(self, results_dict):
+        """Check the parsed results of one calculation index and
+        update the sorting information
+
+        Arguments:
+            results_dict (dict): Results for single image
 
+        Returns:
+            dict: The same results_dict
+        """
         # Must have files: ion, inpt
         if ("ion" not in results_dict) or ("inpt" not in results_dict):
             raise RuntimeError(
@@ -438,13 +583,28 @@ class SparcBundle:
                 ), "Sorting information changed!"
         return results_dict
 
-    def convert_to_ase(self, index=-1, include_all_files=False, **kwargs):
+    def convert_to_ase(
+        self,
+        index=-1,
+        include_all_files=False,
+        use_cache=False,
+        results_dtype=None,
+        n_workers=1,
+        **kwargs,
+    ):
         """Read the raw results from the bundle and create atoms with
         single point calculators
 
         Arguments:
             index (int or str): Index or slice of the image(s) to convert. Uses the same format as ase.io.read
             include_all_files (bool): If true, also read results with indexed suffices
+            use_cache (bool): If true, use the results cache file (see read_raw_results).
+                              Only for trusted bundles, the cache file is unpickled
+            results_dtype (dtype or None): If provided (e.g. np.float32), store forces and
+                                           stresses of the calculators in this dtype to
+                                           save memory for long trajectories. Energies and
+                                           positions always stay in float64
+            n_workers (int): Number of processes to parse the files, see read_raw_results
 
         Returns:
             Atoms or List[Atoms]: ASE-atoms or images with single point results
@@ -453,25 +613,29 @@ class SparcBundle:
         # Convert to images!
         # TODO: @TT 2024-11-01 read_raw_results should implement a more
         # robust behavior handling index, as it is the entry point for all
-        rs = self.read_raw_results(include_all_files=include_all_files)
+        rs = self.read_raw_results(
+            include_all_files=include_all_files,
+            use_cache=use_cache,
+            n_workers=n_workers,
+        )
         if isinstance(rs, dict):
             raw_results = [rs]
         else:
             raw_results = list(rs)
         res_images = []
         for entry in raw_results:
-            if "static" in entry:
-                calc_results, images = self._extract_static_results(entry, index=":")
-            elif "geopt" in entry:
-                calc_results, images = self._extract_geopt_results(entry, index=":")
-            elif "aimd" in entry:
-                calc_results, images = self._extract_aimd_results(entry, index=":")
+            for key, extractor in self._extractors.items():
+                if key in entry:
+                    calc_results, images = extractor(self, entry, index=":")
+                    break
             else:
                 calc_results, images = None, [self.init_atoms.copy()]
 
             if images is not None:
                 if calc_results is not None:
-                    images = self._make_singlepoint(calc_results, images, entry)
+                    images = self._make_singlepoint(
+                        calc_results, images, entry, results_dtype=results_dtype
+                    )
                 res_images.extend(images)
 
         if isinstance(index, int):
@@ -479,7 +643,7 @@ class SparcBundle:
         else:
             return res_images[string2index(index)]
 
-    def _make_singlepoint(self, calc_results, images, raw_results):
+    def _make_singlepoint(self, calc_results, images, raw_results, results_dtype=None):
         """Convert a calculator dict and images of Atoms to list of
         SinglePointDFTCalculators
 
@@ -490,6 +654,7 @@ class SparcBundle:
             calc_results (List): Calculation results for all images
             images (List): Corresponding Atoms images
             raw_results (List): Full raw results dict to obtain additional information
+            results_dtype (dtype or None): If provided, dtype of the array results
 
         Returns:
             List(Atoms): ASE-atoms images with single point calculators attached
@@ -501,6 +666,12 @@ class SparcBundle:
             sp = SinglePointDFTCalculator(atoms)
             # Res can be empty at this point, leading to incomplete calc
             sp.results.update(res)
+            if results_dtype is not None:
+                for key in reduced_precision_results:
+                    if key in sp.results:
+                        sp.results[key] = np.asarray(
+                            sp.results[key], dtype=results_dtype
+                        )
             sp.name = "sparc"
             sp.kpts = raw_results["inpt"].get("params", {}).get("KPOINT_GRID", None)
             # There may be a better way handling the parameters...
@@ -751,6 +922,13 @@ class SparcBundle:
             calc_results.append(partial_result)
         return calc_results, ase_images
 
+    # Result type --> extractor, in the order of priority used by convert_to_ase
+    _extractors = {
+        "static": _extract_static_results,
+        "geopt": _extract_geopt_results,
+        "aimd": _extract_aimd_results,
+    }
+
     @property
     def sort(self):
         """Wrap the self.sorting dict. If sorting information does not exist,
@@ -803,6 +981,18 @@ class SparcBundle:
         return psp_info
 
 
+def _parse_bundle_files(files):
+    """Parse and merge the files of one calculation index (see
+    SparcBundle._files_from_index). Defined at module level so that it can
+    be sent to the worker processes of SparcBundle._parse_raw_results
+    """
+    results_dict = {}
+    for ext, f in files.items():
+        data_dict = globals()[f"_read_{ext}"](f)
+        results_dict.update(data_dict)
+    return results_dict
+
+
 def read_sparc(filename, index=-1, include_all_files=True, **kwargs):
     """Parse a SPARC bundle, return an Atoms object or list of Atoms (image)
     with embedded calculator result.
@@ -811,7 +1001,10 @@ def read_sparc(filename, index=-1, include_all_files=True, **kwargs):
         filename (str or PosixPath): Filename to the sparc bundle
         index (int or str): Index or slice of the images, following the ase.io.read convention
         include_all_files (bool): If true, parse all output files with indexed suffices
-        **kwargs: Additional parameters
+        **kwargs: Additional parameters, e.g. use_cache=True to reuse parsed results
+                  of an unchanged bundle (see SparcBundle.read_raw_results).
+                  Warning: the cache is loaded with pickle, which can execute
+                  arbitrary code. Only use it for bundles you created or trust
 
     Returns:
        Atoms or List[Atoms]
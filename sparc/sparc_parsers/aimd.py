@@ -9,14 +9,13 @@ TODO: more descriptions about this file io parser
 """
 from warnings import warn
 
-import numpy as np
 from ase.units import AUT, Angstrom, Bohr, GPa, Hartree, fs
 
 # Safe wrappers for both string and fd
 from ase.utils import reader, writer
 
 from ..api import SparcAPI
-from .utils import strip_comments
+from .utils import iter_step_texts, parse_float_block, strip_comments
 
 
 @reader
@@ -26,20 +25,14 @@ def _read_aimd(fileobj):
     relaxations are separated by ':MDSTEP:' seperators
 
     """
-    contents = fileobj.read()
     # label = get_label(fileobj, ".ion")
-    # The geopt comments are simply discarded
-    stripped, comments = strip_comments(contents)
-    # Do not include the description lines
-    data = [line for line in stripped if ":Desc" not in line]
-
-    # find the index for all atom type lines. They should be at the
-    # top of their block
-    step_bounds = [i for i, x in enumerate(data) if ":MDSTEP:" in x] + [len(data)]
-    raw_aimd_blocks = [
-        data[start:end] for start, end in zip(step_bounds[:-1], step_bounds[1:])
-    ]
-    aimd_steps = [_read_aimd_step(step) for step in raw_aimd_blocks]
+    # The aimd comments are simply discarded
+    aimd_steps = []
+    for step_text in iter_step_texts(fileobj, ":MDSTEP:"):
+        stripped, comments = strip_comments(step_text)
+        # Do not include the description lines
+        data = [line for line in stripped if ":Desc" not in line]
+        aimd_steps.append(_read_aimd_step(data))
 
     return {"aimd": aimd_steps}
 
@@ -61,7 +54,6 @@ def _read_aimd_step(raw_aimd_text):
         raise ValueError("Wrong aimd format! The :MDSTEP: label is missing.")
     # Geopt file uses 1-indexed step names, convert to 0-indexed
     step = int(header.split(":MDSTEP:")[-1]) - 1
-    print("Step ", step)
     bounds = [i for i, x in enumerate(body) if ":" in x] + [len(body)]
     blocks = [body[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
     data = {}
@@ -74,7 +66,7 @@ def _read_aimd_step(raw_aimd_text):
         else:
             block_raw_data = body_block
         # import pdb; pdb.set_trace()
-        raw_value = np.genfromtxt(block_raw_data, dtype=float)
+        raw_value = parse_float_block(block_raw_data)
         # The type definitions from MD may be treated from API again?
         if header_name == "R":
             name = "positions"
@@ -7,7 +7,6 @@ from warnings import warn
 
 import numpy as np
 from ase import Atom, Atoms
-from ase.constraints import FixAtoms, FixedLine, FixedPlane
 from ase.units import Bohr
 
 from .inpt import _inpt_cell_to_ase_cell
@@ -241,6 +240,9 @@ def constraints_from_relax(relax_dict):
     if len(relax_dict) == 0:
         return []
 
+    # ase.constraints pulls in scipy (via ase.spacegroup), only import it when needed
+    from ase.constraints import FixAtoms, FixedLine, FixedPlane
+
     cons_list = []
     # gathered_indices is an intermediate dict that contains
     # key: relax mask if not all True
@@ -279,6 +281,8 @@ def constraints_from_relax(relax_dict):
 
 def relax_from_constraint(constraint):
     """returns dict of {atom_index: relax_dimensions} for the given constraint"""
+    from ase.constraints import FixAtoms, FixedLine, FixedPlane
+
     type_name = constraint.todict()["name"]
     if isinstance(constraint, FixAtoms):
         dimensions = [False] * 3
@@ -16,7 +16,7 @@ from ase.units import Bohr, GPa, Hartree
 from ase.utils import reader, writer
 
 from ..api import SparcAPI
-from .utils import strip_comments
+from .utils import iter_step_texts, parse_float_block, strip_comments
 
 # TODO: should allow user to select the api
 defaultAPI = SparcAPI()
@@ -30,18 +30,12 @@ def _read_geopt(fileobj):
     ':'
     The relaxations are separated by ':RELAXSTEP:' seperators
     """
-    contents = fileobj.read()
     # label = get_label(fileobj, ".ion")
     # The geopt comments are simply discarded
-    data, comments = strip_comments(contents)
-
-    # find the index for all atom type lines. They should be at the
-    # top of their block
-    step_bounds = [i for i, x in enumerate(data) if ":RELAXSTEP:" in x] + [len(data)]
-    raw_geopt_blocks = [
-        data[start:end] for start, end in zip(step_bounds[:-1], step_bounds[1:])
-    ]
-    geopt_steps = [_read_geopt_step(step) for step in raw_geopt_blocks]
+    geopt_steps = []
+    for step_text in iter_step_texts(fileobj, ":RELAXSTEP:"):
+        data, comments = strip_comments(step_text)
+        geopt_steps.append(_read_geopt_step(data))
 
     return {"geopt": geopt_steps}
 
@@ -69,7 +63,7 @@ def _read_geopt_step(raw_step_text):
         else:
             block_raw_data = body_block
         # import pdb; pdb.set_trace()
-        raw_value = np.genfromtxt(block_raw_data, dtype=float)
+        raw_value = parse_float_block(block_raw_data)
         if "R(Bohr)" in header_name:
             name = "positions"
             value = raw_value.reshape((-1, 3)) * Bohr
@@ -39,9 +39,9 @@ def _write_inpt(fileobj, data_dict, validator=defaultAPI):
         comments = [banner]
     elif "ASE" not in comments[0]:
         comments = [banner] + comments
-    for line in comments:
-        fileobj.write(f"# {line}\n")
-    fileobj.write("\n")
+    # Collect all lines and write the file in one go
+    lines = [f"# {line}\n" for line in comments]
+    lines.append("\n")
     params = inpt_dict["params"]
     for key, val in params.items():
         # TODO: can we add a multiline argument?
@@ -55,7 +55,8 @@ def _write_inpt(fileobj, data_dict, validator=defaultAPI):
             output = f"{key}:\n{val_string}\n"
         else:
             output = f"{key}: {val_string}\n"
-        fileobj.write(output)
+        lines.append(output)
+    fileobj.write("".join(lines))
     return
 
 
@@ -112,10 +112,9 @@ def _write_ion(
             comments.extend(index_lines)
             comments.append("END ASE-SORT")
 
-    for line in comments:
-        fileobj.write(f"# {line}\n")
-
-    fileobj.write("\n")
+    # Collect all lines and write the file in one go
+    lines = [f"# {line}\n" for line in comments]
+    lines.append("\n")
     blocks = ion_dict["atom_blocks"]
     for block in blocks:
         for key in [
@@ -145,12 +144,13 @@ def _write_ion(
                 output = f"{key}:\n{val_string}\n"
             else:
                 output = f"{key}: {val_string}\n"
-            fileobj.write(output)
+            lines.append(output)
             # TODO: check extra keys
             # TODO: how to handle multiple psp files?
         # Write a split line
         # TODO: do we need to distinguish the last line?
-        fileobj.write("\n")
+        lines.append("\n")
+    fileobj.write("".join(lines))
     return
 
 
@@ -23,6 +23,18 @@ from .utils import bisect_and_strip, read_block_input
 # TODO: should allow user to select the api
 defaultAPI = SparcAPI()
 
+# Value (unit) pairs in the energy / force result blocks
+_value_unit_pattern = re.compile(r"([+\-\d.Ee]+)\s+\((.*?)\)")
+# SPARC output unit --> (conversion function, ASE unit)
+_unit_conversions = {
+    "Ha": (lambda x: x * Hartree, "eV"),
+    "Ha/atom": (lambda x: x * Hartree, "eV/atom"),
+    "Ha/Bohr": (lambda x: x * Hartree / Bohr, "eV/Angstrom"),
+    "GPa": (lambda x: x * GPa, "eV/Angstrom^3"),
+    "sec": (lambda x: x, "sec"),
+    "Bohr magneton": (lambda x: x, "Bohr magneton"),
+}
+
 
 @reader
 def _read_out(fileobj):
@@ -204,31 +216,16 @@ def _read_scfs(contents):
                     f"Key {key} appears multiples in one energy / force calculation, your output file may be incorrect."
                 )
             # Conversion of values are relatively easy
-            pattern_value = r"([+\-\d.Ee]+)\s+\((.*?)\)"
-            match = re.findall(pattern_value, value)
+            match = _value_unit_pattern.findall(value)
             raw_value, unit = float(match[0][0]), match[0][1]
-            if unit == "Ha":
-                converted_value = raw_value * Hartree
-                converted_unit = "eV"
-            elif unit == "Ha/atom":
-                converted_value = raw_value * Hartree
-                converted_unit = "eV/atom"
-            elif unit == "Ha/Bohr":
-                converted_value = raw_value * Hartree / Bohr
-                converted_unit = "eV/Angstrom"
-            elif unit == "GPa":
-                converted_value = raw_value * GPa
-                converted_unit = "eV/Angstrom^3"
-            elif unit == "sec":
-                converted_value = raw_value * 1
-                converted_unit = "sec"
-            elif unit == "Bohr magneton":
-                converted_value = raw_value
-                converted_unit = "Bohr magneton"
-            else:
+            conversion = _unit_conversions.get(unit, None)
+            if conversion is None:
                 warn(f"Conversion for unit {unit} unknown! Treat as unit")
                 converted_value = raw_value
                 converted_unit = unit
+            else:
+                convert, converted_unit = conversion
+                converted_value = convert(raw_value)
             current_step[key] = {
                 "value": converted_value,
                 "unit": converted_unit,
@@ -16,7 +16,7 @@ from ase.units import Bohr, GPa, Hartree
 from ase.utils import reader, writer
 
 from ..api import SparcAPI
-from .utils import strip_comments
+from .utils import parse_float_block, strip_comments
 
 # TODO: should allow user to select the api
 # defaultAPI = SparcAPI()
@@ -60,7 +60,7 @@ def _read_static_block(raw_block):
         body = [header_rest.strip()] + body
 
     try:
-        value = np.genfromtxt(body, dtype=float)
+        value = parse_float_block(body)
         if np.isnan(value).any():
             warn(
                 (
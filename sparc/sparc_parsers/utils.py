@@ -1,5 +1,10 @@
+import io
+import mmap
+import re
 from warnings import warn
 
+import numpy as np
+
 
 def get_label(fileobj, ext):
     """Return the label of file by stripping the extension (e.g. .ion)"""
@@ -91,3 +96,60 @@ def make_reverse_mapping(mapping):
     for i, j in enumerate(mapping):
         reverse[j] = i
     return reverse
+
+
+def parse_float_block(lines):
+    """Convert lines of whitespace-separated numbers to a float array
+
+    Fast replacement of np.genfromtxt(lines, dtype=float) for the numeric
+    blocks in .static, .geopt and .aimd files. All numbers are converted
+    in one pass, and the result has the same shape as np.genfromtxt (i.e.
+    single rows / columns are squeezed). Blocks that are not a regular
+    table of numbers fall back to np.genfromtxt
+    """
+    if len(lines) == 0:
+        return np.genfromtxt(lines, dtype=float)
+    rows = [line.split() for line in lines]
+    ncols = len(rows[0])
+    # Ragged rows are handled (or rejected) by np.genfromtxt
+    if (ncols == 0) or any(len(row) != ncols for row in rows):
+        return np.genfromtxt(lines, dtype=float)
+    try:
+        values = np.array([field for row in rows for field in row], dtype=float)
+    except ValueError:
+        return np.genfromtxt(lines, dtype=float)
+    return np.squeeze(values.reshape(len(lines), ncols))
+
+
+def iter_step_texts(fileobj, separator):
+    """Iterate over the text of each step in a .geopt / .aimd file
+
+    Each step starts at a line beginning with `separator` (e.g. ":MDSTEP:"),
+    any text before the first separator is skipped. Files on disk are memory
+    mapped, so only one decoded step is held in memory at a time instead of
+    the full file contents. Other file objects (e.g. StringIO, compressed
+    files, pipes, or files already partially read) are read as a whole
+    """
+    pattern = rf"^[ \t]*{re.escape(separator)}"
+    # Only a plain on-disk text file at its start can be mapped, the fileno of
+    # wrappers like gzip.open(..., "rt") points to the compressed data
+    is_plain_file = isinstance(getattr(fileobj, "buffer", None), io.BufferedReader)
+    mm = None
+    if is_plain_file and fileobj.seekable() and fileobj.tell() == 0:
+        try:
+            mm = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # e.g. empty file
+            mm = None
+    if mm is None:
+        contents = fileobj.read()
+        starts = [m.start() for m in re.finditer(pattern, contents, re.MULTILINE)]
+        for start, end in zip(starts, starts[1:] + [len(contents)]):
+            yield contents[start:end]
+        return
+
+    encoding = getattr(fileobj, "encoding", None) or "utf-8"
+    with mm:
+        starts = [m.start() for m in re.finditer(pattern.encode(), mm, re.MULTILINE)]
+        for start, end in zip(starts, starts[1:] + [len(mm)]):
+            yield mm[start:end].decode(encoding)
@@ -1,6 +1,7 @@
 """Utilities that are loosely related to core sparc functionalities
 """
 import _thread
+import hashlib
 import io
 import os
 import re
@@ -12,6 +13,7 @@ import tempfile
 import threading
 import time
 from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional, Union
 from warnings import warn
@@ -77,20 +79,47 @@ def string2index(string: str) -> Union[int, slice, str]:
     return slice(*i)
 
 
+# Environment variables that affect the result of _find_default_sparc
+_default_sparc_env = (
+    "PATH",
+    "OMPI_COMM_WORLD_SIZE",
+    "OMPI_UNIVERSE_SIZE",
+    "MPICH_RANK_REORDER_METHOD",
+    "SLURM_JOB_CPUS_PER_NODE",
+)
+
+
 def _find_default_sparc():
-    """Find the default sparc by $PATH and mpi location"""
-    sparc_exe = shutil.which("sparc")
+    """Find the default sparc by $PATH and mpi location
+
+    The $PATH scan is cached on the values of the relevant environment
+    variables, so repeated calls from many calculators are cheap.
+    """
+    env = tuple(os.environ.get(var, None) for var in _default_sparc_env)
+    return _find_default_sparc_from_env(env)
+
 
-    mpi_exe = shutil.which("mpirun")
+@lru_cache(maxsize=None)
+def _find_default_sparc_from_env(env):
+    """Cached worker of _find_default_sparc
+
+    Arguments:
+        env (tuple): Values of the variables in _default_sparc_env
+    """
+    environ = {k: v for k, v in zip(_default_sparc_env, env) if v is not None}
+    path = environ.get("PATH", None)
+    sparc_exe = shutil.which("sparc", path=path)
+
+    mpi_exe = shutil.which("mpirun", path=path)
     # TODO: more examples on pbs / lsf
     if mpi_exe is not None:
         try:
             num_cores = int(
-                os.environ.get(
+                environ.get(
                     "OMPI_COMM_WORLD_SIZE",
-                    os.environ.get(
+                    environ.get(
                         "OMPI_UNIVERSE_SIZE",
-                        os.environ.get("MPICH_RANK_REORDER_METHOD", ""),
+                        environ.get("MPICH_RANK_REORDER_METHOD", ""),
                     ).split(":")[-1],
                 )
             )
@@ -98,22 +127,55 @@ def _find_default_sparc():
             num_cores = 1
         return sparc_exe, mpi_exe, num_cores
 
-    mpi_exe = shutil.which("srun")
+    mpi_exe = shutil.which("srun", path=path)
     if mpi_exe is not None:
         # If srun is available, get the number of cores from the environment
-        num_cores = int(os.environ.get("SLURM_JOB_CPUS_PER_NODE", 1))
+        num_cores = int(environ.get("SLURM_JOB_CPUS_PER_NODE", 1))
         return sparc_exe, mpi_exe, num_cores
 
     return sparc_exe, None, 1
 
 
+def _set_mpi_num_procs(command, num_procs):
+    """Rewrite the number of mpi processes in a sparc command,
+    e.g. 'mpirun -n 8 sparc' --> 'mpirun -n 2 sparc'
+
+    Commands without the -n / -np option (e.g. 'srun sparc') are returned
+    unchanged with a warning
+    """
+    new_command, count = re.subn(
+        r"(\s-(?:n|np)\s+)\d+", rf"\g<1>{int(num_procs)}", command, count=1
+    )
+    if count == 0:
+        warn(
+            f"Cannot find the -n / -np option in command '{command}', "
+            f"the number of mpi processes is not set to {int(num_procs)}."
+        )
+    return new_command
+
+
+def _atoms_fingerprint(atoms):
+    """Hash of the atoms properties compared by Calculator.check_state
+    (positions, numbers, cell, pbc, initial magmoms and charges).
+    Equal fingerprints mean the properties are bitwise identical
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(atoms.positions).tobytes())
+    h.update(np.ascontiguousarray(atoms.numbers).tobytes())
+    h.update(np.ascontiguousarray(atoms.cell.array).tobytes())
+    h.update(np.ascontiguousarray(atoms.pbc).tobytes())
+    for name in ("initial_magmoms", "initial_charges"):
+        h.update(name.encode())
+        if name in atoms.arrays:
+            h.update(np.ascontiguousarray(atoms.arrays[name]).tobytes())
+    return h.digest()
+
+
 def h2gpts(h, cell_cv, idiv=4):
     """Convert a h-parameter (Angstrom) to gpts"""
-    cell_cv = np.array(cell_cv)
-    cell_lengths = np.linalg.norm(cell_cv, axis=1)
-    grid = np.ceil(cell_lengths / h)
-    grid = np.maximum(idiv, grid)
-    return [int(a) for a in grid]
+    cell_lengths = np.linalg.norm(np.asarray(cell_cv, dtype=float), axis=1)
+    grid = np.maximum(idiv, np.ceil(cell_lengths / h)).astype(int)
+    return grid.tolist()
 
 
 def cprint(content, color=None, bold=False, underline=False, **kwargs):
@@ -1,6 +1,7 @@
 import tempfile
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 
@@ -441,3 +442,281 @@ def test_sparc_param_change():
         # On ase 3.22 with default BFGS parameters, it taks 6 steps
         assert len(list(tmpdir.glob("*.static*"))) > 3
         assert len(list(tmpdir.glob("*.out*"))) > 3
+
+
+def test_find_default_sparc_cache(monkeypatch):
+    """_find_default_sparc is cached but follows changes of $PATH"""
+    import os
+    import stat
+
+    from sparc.utils import _find_default_sparc, _find_default_sparc_from_env
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setenv("PATH", tmpdir)
+        _find_default_sparc_from_env.cache_clear()
+        sparc_exe, _, _ = _find_default_sparc()
+        assert sparc_exe is None
+        assert _find_default_sparc() == _find_default_sparc()
+        assert _find_default_sparc_from_env.cache_info().hits == 2
+
+        fake_sparc = Path(tmpdir) / "sparc"
+        fake_sparc.write_text("#!/bin/sh\n")
+        os.chmod(fake_sparc, fake_sparc.stat().st_mode | stat.S_IEXEC)
+        # Same environment, the cached result is returned
+        assert _find_default_sparc()[0] is None
+
+        monkeypatch.setenv("PATH", f"{tmpdir}{os.pathsep}")
+        sparc_exe, _, _ = _find_default_sparc()
+        assert Path(sparc_exe) == fake_sparc
+
+
+def test_set_mpi_num_procs():
+    from sparc.utils import _set_mpi_num_procs
+
+    assert _set_mpi_num_procs("mpirun -n 8 sparc", 2) == "mpirun -n 2 sparc"
+    assert (
+        _set_mpi_num_procs("mpiexec -np 16 /opt/bin/sparc", 4)
+        == "mpiexec -np 4 /opt/bin/sparc"
+    )
+    with pytest.warns(UserWarning, match="Cannot find the -n / -np option"):
+        assert _set_mpi_num_procs("srun sparc", 4) == "srun sparc"
+    with pytest.warns(UserWarning, match="Cannot find the -n / -np option"):
+        assert _set_mpi_num_procs("sparc", 4) == "sparc"
+
+
+def _make_stub_sparc(tmpdir, bundle="Cu_FCC.sparc"):
+    """Write a stub sparc command that copies the .out and .static
+    files of a test output bundle as {label}.out and {label}.static
+    """
+    import sys
+
+    script = Path(tmpdir) / "stub_sparc.py"
+    source = Path(__file__).parent / "outputs" / bundle
+    label = source.with_suffix("").name
+    script.write_text(
+        "import shutil, sys\n"
+        "label = sys.argv[sys.argv.index('-name') + 1]\n"
+        "for ext in ('out', 'static'):\n"
+        f"    shutil.copy(r'{source}/{label}.' + ext, label + '.' + ext)\n"
+    )
+    return f"{sys.executable} {script}"
+
+
+def test_calculate_many():
+    """calculate_many runs each image in its own img_{i} directory"""
+    import shutil
+
+    from ase.build import bulk
+
+    from sparc.calculator import SPARC
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Only one Ag pseudopotential in the search path
+        psp_dir = Path(tmpdir) / "psps"
+        psp_dir.mkdir()
+        psp_file = "47_Ag_19_1.9_2.5_pbe_n_v1.0.psp8"
+        shutil.copy(Path(__file__).parent / "psps" / psp_file, psp_dir / psp_file)
+        calc = SPARC(
+            directory=tmpdir, command=_make_stub_sparc(tmpdir), psp_dir=psp_dir
+        )
+        images = [bulk("Ag", "fcc", a=4.0 + 0.05 * i) for i in range(3)]
+        results = calc.calculate_many(images, n_workers=2)
+        assert len(results) == 3
+        for i, res in enumerate(results):
+            assert np.isclose(res["energy"], -19830.966408791148)
+            assert (Path(tmpdir) / f"img_{i}" / "SPARC.ion").is_file()
+            assert (Path(tmpdir) / f"img_{i}" / "SPARC.static").is_file()
+
+        # Parameters loaded from an existing bundle (no LATVEC passed to workers)
+        bundle_dir = Path(tmpdir) / "Cu_FCC.sparc"
+        shutil.copytree(Path(__file__).parent / "outputs" / "Cu_FCC.sparc", bundle_dir)
+        calc = SPARC.from_directory(
+            bundle_dir, command=_make_stub_sparc(tmpdir), psp_dir=psp_dir
+        )
+        results = calc.calculate_many([bulk("Ag", "fcc", a=4.0)])
+        assert np.isclose(results[0]["energy"], -19830.966408791148)
+        assert (bundle_dir / "img_0" / "Cu_FCC.static").is_file()
+
+
+def test_check_state_fingerprint(monkeypatch):
+    """Repeated check_state on unchanged atoms skips the full comparison"""
+    from ase.build import bulk
+    from ase.calculators.calculator import FileIOCalculator
+
+    from sparc.calculator import SPARC
+
+    atoms = bulk("Al", cubic=True)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        calc = SPARC(h=0.2, directory=tmpdir)
+        # Atoms read from the output files always contain initial magmoms
+        calc.atoms = atoms.copy()
+        calc.atoms.set_initial_magnetic_moments([0] * len(atoms))
+        calc.system_state = calc._dump_system_state()
+
+        ncalls = []
+        origin_check_state = FileIOCalculator.check_state
+
+        def _counted_check_state(self, *args, **kwargs):
+            ncalls.append(1)
+            return origin_check_state(self, *args, **kwargs)
+
+        monkeypatch.setattr(FileIOCalculator, "check_state", _counted_check_state)
+        assert calc.check_state(atoms) == []
+        n_full = len(ncalls)
+        assert n_full > 0
+        assert calc.check_state(atoms) == []
+        assert len(ncalls) == n_full
+
+        # Any change goes through the full comparison again
+        atoms.positions[0, 0] += 0.1
+        assert "positions" in calc.check_state(atoms)
+        assert len(ncalls) > n_full
+
+
+def test_from_directory_cache():
+    """SPARC.from_directory reuses parsed results of unchanged directories"""
+    import os
+    import shutil
+
+    from sparc.calculator import SPARC, _read_results_cached
+
+    test_output_dir = Path(__file__).parent / "outputs"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bundle_dir = Path(tmpdir) / "Cu_FCC.sparc"
+        shutil.copytree(test_output_dir / "Cu_FCC.sparc", bundle_dir)
+        _read_results_cached.cache_clear()
+        calc = SPARC.from_directory(bundle_dir)
+        assert calc.label == "Cu_FCC"
+        assert np.isclose(calc.get_potential_energy(), -19830.966408791148)
+        assert calc.parameters["EXCHANGE_CORRELATION"] == "GGA_PBE"
+        calc.results["energy"] = 0.0
+
+        calc1 = SPARC.from_directory(bundle_dir)
+        assert _read_results_cached.cache_info().hits == 1
+        assert np.isclose(calc1.get_potential_energy(), -19830.966408791148)
+
+        # Modified files are parsed again
+        static_file = bundle_dir / "Cu_FCC.static"
+        mtime_ns = static_file.stat().st_mtime_ns + 10**9
+        os.utime(static_file, ns=(mtime_ns, mtime_ns))
+        SPARC.from_directory(bundle_dir)
+        assert _read_results_cached.cache_info().misses == 2
+
+        # User parameters are kept and the previous results cleared, as for restart
+        with pytest.warns(UserWarning, match="previous results will be cleared"):
+            calc2 = SPARC.from_directory(bundle_dir, ecut=40, kpts=(5, 5, 5))
+        assert calc2.parameters["kpts"] == (5, 5, 5)
+        assert calc2.valid_params["ECUT"] == 40
+        assert "EXCHANGE_CORRELATION" not in calc2.parameters
+        assert len(calc2.results) == 0
+        # The cached results are not affected
+        assert np.isclose(
+            SPARC.from_directory(bundle_dir).get_potential_energy(),
+            -19830.966408791148,
+        )
+
+
+def test_from_directory_state():
+    """SPARC.from_directory restores the same state as restart"""
+    from sparc.calculator import SPARC, atoms_inpt_params
+
+    bundle_dir = Path(__file__).parent / "outputs" / "NH3_sort_lbfgs_opt.sparc"
+    calc = SPARC.from_directory(bundle_dir)
+    calc_restart = SPARC(restart=bundle_dir, directory=bundle_dir, label="SPARC")
+    assert calc.sort == calc_restart.sort == [1, 2, 3, 0]
+    assert calc.resort == calc_restart.resort
+    assert calc.sparc_bundle.last_image == calc_restart.sparc_bundle.last_image
+    assert calc.sparc_bundle.init_inputs.keys() == (
+        calc_restart.sparc_bundle.init_inputs.keys()
+    )
+
+    # Parameters are validated and do not contain atoms-derived keys
+    inpt_params = calc.raw_results["inpt"]["params"]
+    assert not atoms_inpt_params.intersection(calc.parameters)
+    assert set(calc.valid_params) == set(inpt_params) - atoms_inpt_params
+    inpt_state = calc._generate_inpt_state(calc.atoms)
+    for key in ("RELAX_FLAG", "EXCHANGE_CORRELATION"):
+        assert inpt_state[key] == inpt_params[key]
+
+
+def test_execute_async():
+    """execute_async runs the command in the background and returns a future"""
+    from sparc.calculator import SPARC
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        calc = SPARC(directory=tmpdir, command="echo")
+        future = calc.execute_async()
+        assert future.result(timeout=30) is None
+        assert calc.process.returncode == 0
+
+        # Errors from execute are re-raised by the future
+        calc.command = "false"
+        future = calc.execute_async()
+        with pytest.raises(RuntimeError):
+            future.result(timeout=30)
+        calc.close()
+        assert calc._executor is None
+
+
+def test_duplicate_params_warning():
+    """Duplicated (case-insensitive) parameters are reported in a single warning"""
+    import warnings
+
+    from sparc.calculator import SPARC
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            calc = SPARC(
+                directory=tmpdir,
+                ecut=30,
+                ECUT=40,
+                Ecut=50,
+                tol_scf=1e-4,
+                TOL_SCF=1e-5,
+            )
+        dup_warnings = [
+            str(wi.message) for wi in w if "multiple times" in str(wi.message)
+        ]
+        assert len(dup_warnings) == 1
+        assert "['ECUT', 'TOL_SCF']" in dup_warnings[0]
+        assert calc.valid_params["ECUT"] == 50
+
+
+def test_h2gpts():
+    """h2gpts returns integer grid points for each cell vector"""
+    from ase.cell import Cell
+
+    from sparc.utils import h2gpts
+
+    gpts = h2gpts(0.25, Cell.fromcellpar([4.0, 5.0, 0.5, 90, 90, 60]))
+    assert gpts == [16, 20, 4]
+    assert all(isinstance(n, int) for n in gpts)
+    assert h2gpts(0.3, np.eye(3) * 3.0) == [10, 10, 10]
+
+
+def test_calculate_no_wait():
+    """calculate(wait=False) returns a future, results are set once it resolves"""
+    import shutil
+    from concurrent.futures import Future
+
+    from ase.build import bulk
+
+    from sparc.calculator import SPARC
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        psp_dir = Path(tmpdir) / "psps"
+        psp_dir.mkdir()
+        psp_file = "47_Ag_19_1.9_2.5_pbe_n_v1.0.psp8"
+        shutil.copy(Path(__file__).parent / "psps" / psp_file, psp_dir / psp_file)
+        calc_dir = Path(tmpdir) / "calc"
+        calc = SPARC(
+            directory=calc_dir, command=_make_stub_sparc(tmpdir), psp_dir=psp_dir
+        )
+        atoms = bulk("Ag", "fcc", a=4.0)
+        future = calc.calculate(atoms, wait=False)
+        assert isinstance(future, Future)
+        assert future.result(timeout=60) is None
+        assert np.isclose(calc.results["energy"], -19830.966408791148)
+        assert (calc_dir / "SPARC.static").is_file()
+        calc.close()
@@ -120,3 +120,90 @@ def test_make_reverse_mapping():
         reverse = make_reverse_mapping(sort)
         rere = make_reverse_mapping(reverse)
         assert np.isclose(sort, rere).all(), f"Reverse error! {sort}, {reverse}, {rere}"
+
+
+def test_parse_float_block():
+    import numpy as np
+
+    from sparc.sparc_parsers.utils import parse_float_block
+
+    # Same shape and values as np.genfromtxt
+    for lines in (
+        ["1.0"],
+        ["1.0 2.0 3.0"],
+        ["1.0", "2.0", "3.0"],
+        ["1.0 2.0 3.0", "4.0 5.0 6.0"],
+        ["-1.5E-01 2.0e+00 3", "4.0 5.0 6.0", "7.0 8.0 9.0"],
+    ):
+        expected = np.genfromtxt(lines, dtype=float)
+        value = parse_float_block(lines)
+        assert value.shape == expected.shape
+        assert np.isclose(value, expected).all()
+
+    # Irregular blocks fall back to genfromtxt
+    value = parse_float_block(["1.0 abc 3.0"])
+    assert np.isnan(value[1])
+
+    # Ragged blocks are not reshaped, even if the total size matches
+    with pytest.raises(ValueError):
+        parse_float_block(["1 2", "3 4 5", "6"])
+
+
+def test_iter_step_texts(tmp_path):
+    import gzip
+    import os
+    from io import StringIO
+
+    from sparc.sparc_parsers.utils import iter_step_texts
+
+    text = "# header\n:MDSTEP: 1\n:E: 1.0\n:MDSTEP: 2\n:E: 2.0\n"
+    expected = [":MDSTEP: 1\n:E: 1.0\n", ":MDSTEP: 2\n:E: 2.0\n"]
+    # In-memory file object
+    assert list(iter_step_texts(StringIO(text), ":MDSTEP:")) == expected
+    assert list(iter_step_texts(StringIO(""), ":MDSTEP:")) == []
+    # Memory-mapped files on disk
+    step_file = tmp_path / "test.aimd"
+    step_file.write_text(text)
+    with open(step_file, "r") as fd:
+        assert list(iter_step_texts(fd, ":MDSTEP:")) == expected
+    # Partially read files continue from the current position
+    with open(step_file, "r") as fd:
+        fd.readline()
+        fd.readline()
+        assert list(iter_step_texts(fd, ":MDSTEP:")) == expected[1:]
+    step_file.write_text("")
+    with open(step_file, "r") as fd:
+        assert list(iter_step_texts(fd, ":MDSTEP:")) == []
+    # Compressed files are not memory mapped
+    gz_file = tmp_path / "test.aimd.gz"
+    with gzip.open(gz_file, "wt") as fd:
+        fd.write(text)
+    with gzip.open(gz_file, "rt") as fd:
+        assert list(iter_step_texts(fd, ":MDSTEP:")) == expected
+    # Non-seekable streams
+    read_fd, write_fd = os.pipe()
+    with open(write_fd, "w") as fd:
+        fd.write(text)
+    with open(read_fd, "r") as fd:
+        assert list(iter_step_texts(fd, ":MDSTEP:")) == expected
+
+
+def test_read_aimd_gzip(tmp_path):
+    import gzip
+    import shutil
+    from pathlib import Path
+
+    from sparc.sparc_parsers.aimd import _read_aimd
+
+    aimd_file = (
+        Path(__file__).parent
+        / "outputs"
+        / "TiO2_orthogonal_quick_md.sparc"
+        / "TiO2_orthogonal_quick_md.aimd"
+    )
+    gz_file = tmp_path / "test.aimd.gz"
+    with open(aimd_file, "rb") as src, gzip.open(gz_file, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    with gzip.open(gz_file, "rt") as fd:
+        steps = _read_aimd(fd)["aimd"]
+    assert len(steps) == len(_read_aimd(aimd_file)["aimd"]) == 5
@@ -325,3 +325,87 @@ def test_bundle_geopt_low_dim_stress():
     print("Max stress (eV/Ang^3) from .out file:", max_stress_equiv_out)
     print("Max stress (eV/Ang^3) from .geopt file:", max_stress_equiv_geopt)
     assert np.isclose(max_stress_equiv_geopt, max_stress_equiv_geopt, 1e-6).all()
+
+
+def test_bundle_results_cache(monkeypatch):
+    """Parsed results are reused from .sparc_cache.pkl until a file changes"""
+    import shutil
+
+    from sparc.io import SparcBundle, results_cache_file
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bundle_dir = Path(tmpdir) / "Cu_FCC.sparc"
+        shutil.copytree(test_output_dir / "Cu_FCC.sparc", bundle_dir)
+        sb = SparcBundle(directory=bundle_dir)
+        results = sb.read_raw_results(use_cache=True)
+        assert (bundle_dir / results_cache_file).is_file()
+
+        def _no_parse(self, **kwargs):
+            raise RuntimeError("Bundle should not be parsed!")
+
+        # Cache is used while the files are unchanged
+        with monkeypatch.context() as m:
+            m.setattr(SparcBundle, "_parse_raw_results", _no_parse)
+            sb = SparcBundle(directory=bundle_dir)
+            cached_results = sb.read_raw_results(use_cache=True)
+            assert np.isclose(
+                cached_results["static"][0]["free energy"],
+                results["static"][0]["free energy"],
+            )
+            assert sb.last_image == 0
+
+            # Cache is ignored when a file is modified
+            with open(bundle_dir / "Cu_FCC.static", "a") as fd:
+                fd.write("\n")
+            sb = SparcBundle(directory=bundle_dir)
+            with pytest.raises(RuntimeError):
+                sb.read_raw_results(use_cache=True)
+
+        sb = SparcBundle(directory=bundle_dir)
+        new_results = sb.read_raw_results(use_cache=True)
+        assert np.isclose(
+            new_results["static"][0]["free energy"],
+            results["static"][0]["free energy"],
+        )
+
+
+def test_bundle_results_dtype():
+    """Forces and stresses can be stored in reduced precision"""
+    import numpy as np
+
+    from sparc.io import SparcBundle
+
+    bundle = test_output_dir / "TiO2_orthogonal_quick_md.sparc"
+    images = SparcBundle(directory=bundle).convert_to_ase(index=":")
+    images32 = SparcBundle(directory=bundle).convert_to_ase(
+        index=":", results_dtype=np.float32
+    )
+    assert len(images) == len(images32)
+    for atoms, atoms32 in zip(images, images32):
+        forces = atoms32.calc.results["forces"]
+        assert forces.dtype == np.float32
+        assert np.allclose(forces, atoms.get_forces(), atol=1e-5)
+        # Energies and positions are not affected
+        assert atoms32.get_potential_energy() == atoms.get_potential_energy()
+        assert atoms32.positions.dtype == np.float64
+
+
+def test_bundle_parallel_parsing():
+    """Parsing multiple output files in worker processes gives the same images"""
+    import numpy as np
+
+    from sparc.io import SparcBundle
+
+    bundle = test_output_dir / "Al_multi_geopt.sparc"
+    images = SparcBundle(directory=bundle).convert_to_ase(
+        index=":", include_all_files=True
+    )
+    images_par = SparcBundle(directory=bundle).convert_to_ase(
+        index=":", include_all_files=True, n_workers=2
+    )
+    assert len(images) == len(images_par)
+    for atoms, atoms_par in zip(images, images_par):
+        assert np.isclose(
+            atoms.get_potential_energy(), atoms_par.get_potential_energy()
+        )
+        assert np.allclose(atoms.positions, atoms_par.positions)